@@ -1,22 +1,23 @@
 # convert_coords.py
 
 def convert_to_coordinates(input_file, output_file):
-    with open(input_file, 'r') as f:
-        lines = f.readlines()
-
-    coordinates = []
-    for line in lines:
-        parts = line.strip().split()
-        if len(parts) == 3:
+    # Stream line-by-line instead of buffering the whole input and an
+    # intermediate list of formatted strings.
+    count = 0
+    with open(input_file, 'r') as fin, open(output_file, 'w') as fout:
+        fout.write("Coordinate[] path = {\n")
+        for line in fin:
+            parts = line.split()
+            if len(parts) != 3:
+                continue
             x, y, z = parts
-            coordinates.append(f"    new Coordinate({x}, {y}, {z})")
-
-    with open(output_file, 'w') as f:
-        f.write("Coordinate[] path = {\n")
-        f.write(",\n".join(coordinates))
-        f.write("\n};\n")
+            if count:
+                fout.write(",\n")
+            fout.write(f"    new Coordinate({x}, {y}, {z})")
+            count += 1
+        fout.write("\n};\n")
 
-    print(f"✅ Converted {len(coordinates)} coordinates and saved to '{output_file}'.")
+    print(f"✅ Converted {count} coordinates and saved to '{output_file}'.")
 
 
 if __name__ == "__main__":
@@ -3,11 +3,37 @@
 import argparse
 import base64
 import binascii
+import csv
+import itertools
 import json
 import re
 import sqlite3
+import struct
 import sys
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; fall back to the pure-Python decoder
+    np = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to stdlib json
+    orjson = None
+
+_TRIPLET = struct.Struct("<iii")
+
+_SQLITE_X_RE = re.compile(r"[xX]'([0-9A-Fa-f\s]+)'")
+_BSX_RE = re.compile(r"\\x")
+_HEX_ONLY_RE = re.compile(r"[0-9A-Fa-f]+")
+# str.translate is ~3x faster than a regex substitution for stripping
+# whitespace from candidate hex strings.
+_WS_DELETE = {9: None, 10: None, 13: None, 32: None}
+
+# Printable ASCII plus tab/newline/CR; anything outside this set means the
+# blob is already raw binary.
+_PRINTABLE = bytes(range(0x20, 0x7F)) + b"\t\n\r"
 
 def _maybe_hex_text_to_bytes(b: bytes) -> bytes:
     """
@@ -18,16 +44,18 @@ def _maybe_hex_text_to_bytes(b: bytes) -> bytes:
       - bare hex string
       - base64 (fallback)
     """
-    # If already binary-like (non-printable bytes), return as-is
-    if any(ch > 0x7E or ch < 0x20 for ch in b if ch not in (9, 10, 13)):
+    # If already binary-like (non-printable bytes), return as-is.  translate
+    # with a deletion table runs the whole scan in C; any surviving byte is
+    # non-printable.
+    if b.translate(None, _PRINTABLE):
         return b
 
     s = b.decode("utf-8", errors="replace").strip()
 
     # SQLite X'...'
-    m = re.fullmatch(r"[xX]'([0-9A-Fa-f\s]+)'", s)
+    m = _SQLITE_X_RE.fullmatch(s)
     if m:
-        hexpart = re.sub(r"\s+", "", m.group(1))
+        hexpart = m.group(1).translate(_WS_DELETE)
         try:
             return binascii.unhexlify(hexpart)
         except binascii.Error:
@@ -35,17 +63,16 @@ def _maybe_hex_text_to_bytes(b: bytes) -> bytes:
 
     # \x.. escaped hex
     if "\\x" in s:
-        hexpart = re.sub(r"\\x", "", s)
-        hexpart = re.sub(r"\s+", "", hexpart)
-        if re.fullmatch(r"[0-9A-Fa-f]+", hexpart or "0"):
+        hexpart = _BSX_RE.sub("", s).translate(_WS_DELETE)
+        if _HEX_ONLY_RE.fullmatch(hexpart or "0"):
             try:
                 return binascii.unhexlify(hexpart)
             except binascii.Error:
                 pass
 
     # Bare hex
-    bare = re.sub(r"\s+", "", s)
-    if len(bare) >= 2 and re.fullmatch(r"[0-9A-Fa-f]+", bare) and len(bare) % 2 == 0:
+    bare = s.translate(_WS_DELETE)
+    if len(bare) >= 2 and _HEX_ONLY_RE.fullmatch(bare) and len(bare) % 2 == 0:
         try:
             return binascii.unhexlify(bare)
         except binascii.Error:
@@ -61,16 +88,31 @@ def _maybe_hex_text_to_bytes(b: bytes) -> bytes:
     return b
 
 
-def decode_triplets_le_i32(buf: bytes) -> List[Tuple[int, int, int]]:
+def _normalize_blob(raw) -> bytes | memoryview:
+    """
+    Return a buffer decode_triplets_le_i32 can read, copying only when the
+    blob might be hex/base64 text. A memoryview whose prefix is clearly
+    binary is passed through as-is (zero-copy).
+    """
+    if isinstance(raw, memoryview):
+        if bytes(raw[:64]).translate(None, _PRINTABLE):
+            return raw
+        raw = raw.tobytes()
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    if isinstance(raw, bytearray):
+        raw = bytes(raw)
+    return _maybe_hex_text_to_bytes(raw)
+
+
+def decode_triplets_le_i32(buf: bytes | memoryview) -> List[Sequence[int]]:
     if len(buf) % 12 != 0:
         raise ValueError(f"Blob length {len(buf)} is not a multiple of 12 bytes.")
-    pts = []
-    for i in range(0, len(buf), 12):
-        x = int.from_bytes(buf[i:i+4], "little", signed=True)
-        y = int.from_bytes(buf[i+4:i+8], "little", signed=True)
-        plane = int.from_bytes(buf[i+8:i+12], "little", signed=True)
-        pts.append((x, y, plane))
-    return pts
+    if np is not None:
+        # One memcpy into an int32 array, then a single bulk conversion back to
+        # Python ints, instead of three int.from_bytes calls per point.
+        return np.frombuffer(buf, dtype="<i4").reshape(-1, 3).tolist()
+    return list(_TRIPLET.iter_unpack(buf))
 
 
 def main():
@@ -92,34 +134,43 @@ def main():
 
     with sqlite3.connect(args.database) as conn:
         conn.row_factory = sqlite3.Row
+        # Read-side tuning: mmap the DB file so the OS page cache backs the
+        # scan, and give SQLite a larger page cache (~200 MB).
+        conn.execute("PRAGMA mmap_size=1073741824")
+        conn.execute("PRAGMA cache_size=-200000")
+        conn.execute("PRAGMA temp_store=MEMORY")
         query = f"SELECT entrance_from, entrance_to, path_blob FROM {args.table}"
         params = []
         if args.entrance_from is not None:
             query += " WHERE entrance_from = ?"
             params.append(args.entrance_from)
         query += " ORDER BY entrance_from, entrance_to"
-        rows = conn.execute(query, params).fetchall()
+        cur = conn.execute(query, params)
+        cur.arraysize = 1000
+
+        first = cur.fetchone()
+        if first is None:
+            raise ValueError("No rows found matching the given criteria.")
+
+        # Stream rows off the cursor instead of fetchall()-ing the whole
+        # table into memory before decoding.
+        decoded_rows = _iter_decoded(itertools.chain((first,), cur))
+        _emit(args, decoded_rows)
 
-    if not rows:
-        raise ValueError("No rows found matching the given criteria.")
 
-    decoded_rows = []
+def _iter_decoded(rows):
     for row in rows:
         raw_blob = row["path_blob"]
         if raw_blob is None:
             points = []
         else:
-            if isinstance(raw_blob, memoryview):
-                raw_blob = raw_blob.tobytes()
-            if isinstance(raw_blob, str):
-                raw_blob = raw_blob.encode("utf-8")
-            if isinstance(raw_blob, bytearray):
-                raw_blob = bytes(raw_blob)
-            points = decode_triplets_le_i32(_maybe_hex_text_to_bytes(raw_blob))
-        decoded_rows.append((row["entrance_from"], row["entrance_to"], points))
+            points = decode_triplets_le_i32(_normalize_blob(raw_blob))
+        yield row["entrance_from"], row["entrance_to"], points
 
+
+def _emit(args, decoded_rows):
     if args.format == "json":
-        out_text = json.dumps([
+        payload = [
             {
                 "entrance_from": entrance_from,
                 "entrance_to": entrance_to,
@@ -129,29 +180,57 @@ def main():
                 ],
             }
             for entrance_from, entrance_to, points in decoded_rows
-        ], indent=2)
-    elif args.format == "csv":
-        lines = ["entrance_from,entrance_to,x,y,plane"]
-        for entrance_from, entrance_to, points in decoded_rows:
-            if points:
-                for x, y, plane in points:
-                    lines.append(f"{entrance_from},{entrance_to},{x},{y},{plane}")
+        ]
+        if orjson is not None:
+            # orjson serializes in C and emits bytes directly.
+            data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+            if args.output:
+                with open(args.output, "wb") as f:
+                    f.write(data)
             else:
-                lines.append(f"{entrance_from},{entrance_to},,,")
-        out_text = "\n".join(lines)
+                sys.stdout.buffer.write(data + b"\n")
+            return
+        out_text = json.dumps(payload, indent=2)
+    elif args.format == "csv":
+        # Stream rows straight to the output instead of accumulating one
+        # giant string; csv.writer formats rows in C.
+        out_fp = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+        try:
+            writer = csv.writer(out_fp, lineterminator="\n")
+            writer.writerow(("entrance_from", "entrance_to", "x", "y", "plane"))
+            for entrance_from, entrance_to, points in decoded_rows:
+                if points:
+                    writer.writerows(
+                        (entrance_from, entrance_to, x, y, plane) for x, y, plane in points
+                    )
+                else:
+                    writer.writerow((entrance_from, entrance_to, "", "", ""))
+        finally:
+            if out_fp is not sys.stdout:
+                out_fp.close()
+        return
     else:
-        blocks = []
-        for entrance_from, entrance_to, points in decoded_rows:
-            header = (
-                f"Coordinate[] path_from_{entrance_from}_to_{entrance_to} = {{"
-            )
-            if points:
-                body_lines = [f"    new Coordinate({x}, {y}, {plane})" for x, y, plane in points]
-                block = "\n".join([header, ",\n".join(body_lines), "};"])
-            else:
-                block = "\n".join([header, "};"])
-            blocks.append(block)
-        out_text = "\n\n".join(blocks)
+        # Write each block incrementally instead of join()-ing lists of
+        # lines, which made three passes over the data.
+        out_fp = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            first_block = True
+            for entrance_from, entrance_to, points in decoded_rows:
+                if not first_block:
+                    out_fp.write("\n\n")
+                first_block = False
+                out_fp.write(f"Coordinate[] path_from_{entrance_from}_to_{entrance_to} = {{")
+                sep = "\n"
+                for x, y, plane in points:
+                    out_fp.write(f"{sep}    new Coordinate({x}, {y}, {plane})")
+                    sep = ",\n"
+                out_fp.write("\n};")
+            if out_fp is sys.stdout:
+                out_fp.write("\n")
+        finally:
+            if out_fp is not sys.stdout:
+                out_fp.close()
+        return
 
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
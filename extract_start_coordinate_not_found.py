@@ -6,16 +6,35 @@ import json
 import re
 import sys
 from dataclasses import dataclass
-from typing import IO, Any, Dict, Iterable, List, Optional, Tuple
-
-
-_OPTIONS_START_RE = re.compile(
-    r"start=\[\s*X:\s*(?P<x>-?\d+),\s*Y:\s*(?P<y>-?\d+),\s*Z:\s*(?P<z>-?\d+)\s*\]"
-)
-_OPTIONS_GOAL_RE = re.compile(
-    r"goal=\[\s*X:\s*(?P<x>-?\d+),\s*Y:\s*(?P<y>-?\d+),\s*Z:\s*(?P<z>-?\d+)\s*\]"
+from functools import lru_cache
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    # google-re2's DFA engine scans lines considerably faster than the
+    # stdlib backtracking engine; optional, same match API.
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+try:
+    # orjson parses the response payloads 3-5x faster than stdlib json.
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+# The log is scanned as bytes (no up-front UTF-8 decode of every line);
+# only matched timestamp captures are decoded to str.
+#
+# start and goal are matched in a single pass; the goal group is optional
+# so request lines without a goal still match.
+_OPTIONS_RE = _re_engine.compile(
+    rb"start=\[\s*X:\s*(-?\d+),\s*Y:\s*(-?\d+),\s*Z:\s*(-?\d+)\s*\]"
+    rb"(?:.*?goal=\[\s*X:\s*(-?\d+),\s*Y:\s*(-?\d+),\s*Z:\s*(-?\d+)\s*\])?"
 )
-_TIMESTAMP_RE = re.compile(r"^\[(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3})\]\s*")
+_TIMESTAMP_RE = _re_engine.compile(rb"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3})\]\s*")
 
 
 @dataclass
@@ -36,32 +55,34 @@ class ExtractedFailure:
     response_line_no: int
 
 
-def _parse_timestamp(line: str) -> Optional[str]:
+def _parse_timestamp(line: bytes) -> Optional[str]:
     m = _TIMESTAMP_RE.match(line)
     if not m:
         return None
-    return m.group("ts")
+    return m.group(1).decode("ascii")
 
 
-def _parse_options_line(line: str) -> Optional[Tuple[Tuple[int, int, int], Optional[Tuple[int, int, int]]]]:
-    start_m = _OPTIONS_START_RE.search(line)
-    if not start_m:
+@lru_cache(maxsize=4096)
+def _parse_options_line(line: bytes) -> Optional[Tuple[Tuple[int, int, int], Optional[Tuple[int, int, int]]]]:
+    m = _OPTIONS_RE.search(line)
+    if not m:
         return None
 
-    start = (int(start_m.group("x")), int(start_m.group("y")), int(start_m.group("z")))
+    # Positional groups: named groups on bytes patterns are keyed as bytes
+    # under re2, which diverges from the stdlib API.
+    start = (int(m.group(1)), int(m.group(2)), int(m.group(3)))
 
-    goal_m = _OPTIONS_GOAL_RE.search(line)
     goal: Optional[Tuple[int, int, int]]
-    if goal_m:
-        goal = (int(goal_m.group("x")), int(goal_m.group("y")), int(goal_m.group("z")))
+    if m.group(4) is not None:
+        goal = (int(m.group(4)), int(m.group(5)), int(m.group(6)))
     else:
         goal = None
 
     return start, goal
 
 
-def _extract_json_payload(line: str) -> Optional[str]:
-    idx = line.find("{")
+def _extract_json_payload(line: bytes) -> Optional[bytes]:
+    idx = line.find(b"{")
     if idx == -1:
         return None
     return line[idx:].strip()
@@ -105,21 +126,26 @@ def _parse_start_from_action(action: Dict[str, Any]) -> Optional[Tuple[int, int,
     return None
 
 
-def extract_failures(log_file: IO[str]) -> List[ExtractedFailure]:
+def extract_failures(log_file: IO[bytes]) -> Iterator[ExtractedFailure]:
     last_request: Optional[RequestContext] = None
-    out: List[ExtractedFailure] = []
 
     for idx, raw_line in enumerate(log_file, start=1):
-        line = raw_line.rstrip("\n")
+        # Cheap C-speed substring gate before any allocation or regex work.
+        if b"Options(command=python3" not in raw_line and b"start_coordinate_not_found" not in raw_line:
+            continue
+
+        line = raw_line.rstrip(b"\n")
 
-        if "Options(command=python3" in line:
-            parsed = _parse_options_line(line)
+        if b"Options(command=python3" in line:
+            # Key the memoized parse on the Options(...) suffix so repeated
+            # requests with different timestamps still hit the cache.
+            parsed = _parse_options_line(line[line.find(b"Options(") :])
             if parsed is not None:
                 ts = _parse_timestamp(line) or ""
                 start, goal = parsed
                 last_request = RequestContext(ts=ts, start=start, goal=goal, line_no=idx)
 
-        if "start_coordinate_not_found" not in line:
+        if b"start_coordinate_not_found" not in line:
             continue
 
         payload = _extract_json_payload(line)
@@ -128,7 +154,7 @@ def extract_failures(log_file: IO[str]) -> List[ExtractedFailure]:
 
         parsed_json: Optional[Dict[str, Any]] = None
         try:
-            candidate = json.loads(payload)
+            candidate = _json_loads(payload)
             if isinstance(candidate, dict):
                 parsed_json = candidate
         except Exception:
@@ -144,24 +170,41 @@ def extract_failures(log_file: IO[str]) -> List[ExtractedFailure]:
             if start is None:
                 continue
 
-            out.append(
-                ExtractedFailure(
-                    response_ts=response_ts,
-                    start=start,
-                    request_ts=last_request.ts if last_request else None,
-                    goal=last_request.goal if last_request else None,
-                    request_line_no=last_request.line_no if last_request else None,
-                    response_line_no=idx,
-                )
+            yield ExtractedFailure(
+                response_ts=response_ts,
+                start=start,
+                request_ts=last_request.ts if last_request else None,
+                goal=last_request.goal if last_request else None,
+                request_line_no=last_request.line_no if last_request else None,
+                response_line_no=idx,
             )
 
-    return out
+
+def _csv_tuple(r: ExtractedFailure) -> Tuple[Any, ...]:
+    goal_x = goal_y = goal_z = None
+    if r.goal is not None:
+        goal_x, goal_y, goal_z = r.goal
+
+    return (
+        r.response_ts,
+        r.start[0],
+        r.start[1],
+        r.start[2],
+        r.request_ts,
+        goal_x,
+        goal_y,
+        goal_z,
+        r.request_line_no,
+        r.response_line_no,
+    )
 
 
-def _write_csv(rows: List[ExtractedFailure], fp: IO[str]) -> None:
-    writer = csv.DictWriter(
-        fp,
-        fieldnames=[
+def _write_csv(rows: Iterable[ExtractedFailure], fp: IO[str]) -> None:
+    # Plain csv.writer + writerows over a generator keeps the per-row work
+    # in C and avoids DictWriter's per-field dict lookups.
+    writer = csv.writer(fp)
+    writer.writerow(
+        (
             "response_ts",
             "start_x",
             "start_y",
@@ -172,31 +215,12 @@ def _write_csv(rows: List[ExtractedFailure], fp: IO[str]) -> None:
             "goal_z",
             "request_line_no",
             "response_line_no",
-        ],
-    )
-    writer.writeheader()
-    for r in rows:
-        goal_x = goal_y = goal_z = None
-        if r.goal is not None:
-            goal_x, goal_y, goal_z = r.goal
-
-        writer.writerow(
-            {
-                "response_ts": r.response_ts,
-                "start_x": r.start[0],
-                "start_y": r.start[1],
-                "start_z": r.start[2],
-                "request_ts": r.request_ts,
-                "goal_x": goal_x,
-                "goal_y": goal_y,
-                "goal_z": goal_z,
-                "request_line_no": r.request_line_no,
-                "response_line_no": r.response_line_no,
-            }
         )
+    )
+    writer.writerows(map(_csv_tuple, rows))
 
 
-def _write_json(rows: List[ExtractedFailure], fp: IO[str]) -> None:
+def _write_json(rows: Iterable[ExtractedFailure], fp: IO[str]) -> None:
     payload: List[Dict[str, Any]] = []
     for r in rows:
         payload.append(
@@ -222,20 +246,22 @@ def main() -> int:
     ap.add_argument("--format", choices=["csv", "json"], default="csv")
     args = ap.parse_args()
 
-    with open(args.log, "r", encoding="utf-8", errors="replace") as f:
+    # extract_failures is lazy, so writing must happen while the log file
+    # is still open.
+    with open(args.log, "rb") as f:
         rows = extract_failures(f)
 
-    if args.output:
-        with open(args.output, "w", encoding="utf-8", newline="") as out_fp:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as out_fp:
+                if args.format == "csv":
+                    _write_csv(rows, out_fp)
+                else:
+                    _write_json(rows, out_fp)
+        else:
             if args.format == "csv":
-                _write_csv(rows, out_fp)
+                _write_csv(rows, sys.stdout)
             else:
-                _write_json(rows, out_fp)
-    else:
-        if args.format == "csv":
-            _write_csv(rows, sys.stdout)
-        else:
-            _write_json(rows, sys.stdout)
+                _write_json(rows, sys.stdout)
 
     return 0
 
@@ -1,11 +1,10 @@
 use anyhow::{bail, Context, Result};
 use calamine::{open_workbook_auto, DataType, Reader};
-use rusqlite::{params_from_iter, Connection};
+use rusqlite::{params_from_iter, Connection, TransactionBehavior};
 use std::collections::{BTreeMap, HashMap, HashSet};
 use std::fs;
 use std::path::{Path, PathBuf};
 use tempfile::NamedTempFile;
-use std::io::Write;
 use url::Url;
 
 const ALLOWED_NEXT_NODE_TYPES: &[&str] = &[
@@ -57,12 +56,41 @@ struct Column {
     decl_type: String,
     notnull: bool,
     pk: bool,
+    // Affinity flags derived from decl_type once at introspection so the
+    // per-cell coercer does no string scanning.
+    is_integer: bool,
+    is_text: bool,
 }
 
-fn normalize_specials(table_name: &str, row: &mut BTreeMap<String, rusqlite::types::Value>) -> Result<()> {
-    let t = table_name.to_ascii_lowercase();
+/// Which special normalizations/validations apply to a table; computed once
+/// per sheet so the per-row passes skip name comparisons and column probes.
+#[derive(Clone, Copy)]
+struct SpecialChecks {
+    door_direction: bool,
+    requirement_comparison: bool,
+    next_node_type: bool,
+    requirements: bool,
+}
+
+impl SpecialChecks {
+    fn for_table(table: &Table) -> Self {
+        let t = table.name.to_ascii_lowercase();
+        SpecialChecks {
+            door_direction: t == "door_nodes" && table.columns.contains_key("direction"),
+            requirement_comparison: t == "requirements" && table.columns.contains_key("comparison"),
+            next_node_type: table.columns.contains_key("next_node_type"),
+            requirements: table.columns.contains_key("requirements"),
+        }
+    }
+
+    fn any(&self) -> bool {
+        self.door_direction || self.requirement_comparison || self.next_node_type || self.requirements
+    }
+}
+
+fn normalize_specials(checks: SpecialChecks, row: &mut BTreeMap<String, rusqlite::types::Value>) -> Result<()> {
     // Normalize door_nodes.direction to uppercase
-    if t == "door_nodes" {
+    if checks.door_direction {
         if let Some(v) = row.get_mut("direction") {
             if let rusqlite::types::Value::Text(ref mut s) = v {
                 *s = s.trim().to_ascii_uppercase();
@@ -70,12 +98,17 @@ fn normalize_specials(table_name: &str, row: &mut BTreeMap<String, rusqlite::typ
         }
     }
     // Normalize next_node_type to lowercase
-    if let Some(v) = row.get_mut("next_node_type") {
-        if let rusqlite::types::Value::Text(ref mut s) = v {
-            *s = s.trim().to_ascii_lowercase();
+    if checks.next_node_type {
+        if let Some(v) = row.get_mut("next_node_type") {
+            if let rusqlite::types::Value::Text(ref mut s) = v {
+                *s = s.trim().to_ascii_lowercase();
+            }
         }
     }
 
+    if !checks.requirements {
+        return Ok(());
+    }
     if let Some(v) = row.get_mut("requirements") {
         match v {
             rusqlite::types::Value::Text(ref mut s) => {
@@ -97,20 +130,11 @@ fn normalize_specials(table_name: &str, row: &mut BTreeMap<String, rusqlite::typ
     Ok(())
 }
 
-impl Column {
-    fn is_integer(&self) -> bool {
-        self.decl_type.to_uppercase().contains("INT")
-    }
-    fn is_text(&self) -> bool {
-        let up = self.decl_type.to_uppercase();
-        up.contains("CHAR") || up.contains("CLOB") || up.contains("TEXT")
-    }
-}
-
 #[derive(Clone, Debug)]
 struct Table {
     name: String,
     columns: HashMap<String, Column>, // lowercased key -> Column
+    pk_name: Option<String>,          // single-column PK, resolved at introspection
 }
 
 pub fn cmd_import_xlsx(xlsx: &str, db: &Path, dry_run: bool, truncate: &[String], sheets: &[String]) -> Result<()> {
@@ -131,11 +155,26 @@ pub fn cmd_import_xlsx(xlsx: &str, db: &Path, dry_run: bool, truncate: &[String]
     };
 
     let mut conn = Connection::open(db).with_context(|| format!("Open DB {}", db.display()))?;
-    conn.execute_batch("PRAGMA foreign_keys=ON;")?;
+    if !dry_run {
+        // Bulk-write tuning; must run outside the import transaction. A dry
+        // run never writes (and rolls back), so it skips FK enforcement and
+        // leaves the journal mode of the DB file untouched.
+        conn.execute_batch(
+            "PRAGMA foreign_keys=ON;
+             PRAGMA journal_mode=WAL;
+             PRAGMA synchronous=NORMAL;
+             PRAGMA temp_store=MEMORY;
+             PRAGMA cache_size=-65536;",
+        )?;
+    }
 
     // Introspect tables outside the transaction for simple typing
     let tables = fetch_existing_tables(&conn)?;
-    let mut tx = conn.transaction()?;
+    // BEGIN IMMEDIATE: take the write lock up front instead of upgrading
+    // mid-import and risking SQLITE_BUSY halfway through.
+    let mut tx = conn.transaction_with_behavior(TransactionBehavior::Immediate)?;
+    // Run FK checks once at COMMIT instead of per inserted row.
+    tx.execute_batch("PRAGMA defer_foreign_keys=ON;")?;
     let truncate_set: HashSet<String> = truncate.iter().map(|s| s.to_lowercase()).collect();
     let only_set: Option<HashSet<String>> = if sheets.is_empty() {
         None
@@ -158,17 +197,20 @@ pub fn cmd_import_xlsx(xlsx: &str, db: &Path, dry_run: bool, truncate: &[String]
         }
     }
 
-    // Truncate if requested
+    // Truncate if requested; one multi-statement batch instead of a
+    // prepare/execute round trip per table.
+    let mut truncate_sql = String::new();
     for tkey in &truncate_set {
         let t = &tables[tkey];
         println!("Truncating table: {}", t.name);
-        if !dry_run {
-            tx.execute(&format!("DELETE FROM {}", t.name), [])?;
-        }
+        truncate_sql.push_str(&format!("DELETE FROM {};", t.name));
         if TELEPORT_NODE_TABLES.contains(&t.name.to_ascii_lowercase().as_str()) {
             teleports_touched = true;
         }
     }
+    if !dry_run && !truncate_sql.is_empty() {
+        tx.execute_batch(&truncate_sql)?;
+    }
 
     // Open workbook
     let mut wb = open_workbook_auto(&xlsx_path)
@@ -197,26 +239,39 @@ pub fn cmd_import_xlsx(xlsx: &str, db: &Path, dry_run: bool, truncate: &[String]
 
         if let Some(Ok(range)) = wb.worksheet_range(&sheet) {
             println!("Processing worksheet '{}' -> table '{}'", sheet, table.name);
-            let rows = read_worksheet(&range, table)?;
-            println!("  Prepared {} row(s)", rows.len());
+            let mut sheet_rows = 0usize;
             let mut sheet_preview = 0usize;
+            let checks = SpecialChecks::for_table(table);
+            // SQL text per distinct column set; rows in a sheet almost always
+            // share one shape, so this builds each statement string once.
+            let mut sql_cache: HashMap<Vec<String>, String> = HashMap::new();
             if TELEPORT_NODE_TABLES.contains(&table.name.to_ascii_lowercase().as_str()) {
                 teleports_touched = true;
             }
-            for mut r in rows {
-                normalize_specials(&table.name, &mut r)?;
-                validate_specials(&table.name, &r)?;
-                let (sql, params) = build_insert_sql(table, &r)?;
+            for mut r in worksheet_rows(&range, table) {
+                sheet_rows += 1;
+                if checks.any() {
+                    normalize_specials(checks, &mut r)?;
+                    validate_specials(checks, &r)?;
+                }
+                let (cols, params) = row_insert_parts(table, &r)?;
+                let sql = sql_cache
+                    .entry(cols)
+                    .or_insert_with_key(|c| insert_sql_text(table, c));
                 if dry_run {
                     if sheet_preview < 5 {
                         println!("  SQL: {}\n  Params: {:?}", sql, params);
                         sheet_preview += 1;
                     }
                 } else {
-                    tx.execute(&sql, params_from_iter(params))?;
+                    // Rows sharing a column set produce identical SQL, so the
+                    // statement cache turns the per-row prepare into a lookup.
+                    let mut stmt = tx.prepare_cached(sql)?;
+                    stmt.execute(params_from_iter(params))?;
                 }
                 total_inserted += 1;
             }
+            println!("  Prepared {} row(s)", sheet_rows);
         } else {
             println!("Skipping worksheet '{}' (unable to read range)", sheet);
         }
@@ -307,51 +362,56 @@ fn build_gsheet_export_url(doc_url: &str) -> Result<String> {
 
 fn download_google_sheet_as_xlsx(doc_url: &str) -> Result<PathBuf> {
     let export = build_gsheet_export_url(doc_url)?;
-    let resp = reqwest::blocking::get(&export)
+    let mut resp = reqwest::blocking::get(&export)
         .with_context(|| format!("Download {}", export))?;
     if !resp.status().is_success() {
         bail!("Failed to download Google Sheet: HTTP {}", resp.status());
     }
-    let bytes = resp.bytes()?;
+    // Stream straight to the temp file instead of buffering the whole
+    // workbook in memory first.
     let mut tmp = NamedTempFile::new()?;
-    tmp.as_file_mut().write_all(&bytes)?;
+    std::io::copy(&mut resp, tmp.as_file_mut())?;
     let (_file, path) = tmp.keep()?;
     Ok(path)
 }
 
 fn fetch_existing_tables(conn: &Connection) -> Result<HashMap<String, Table>> {
     let mut out: HashMap<String, Table> = HashMap::new();
-    let mut stmt = conn.prepare("SELECT name FROM sqlite_master WHERE type='table'")?;
-    let names: Vec<String> = stmt
-        .query_map([], |row| row.get::<_, String>(0))?
-        .collect::<std::result::Result<_, _>>()?;
-    for tname in names {
-        if tname.starts_with("sqlite_") {
-            continue;
-        }
-        let mut cols_stmt = conn.prepare(&format!("PRAGMA table_info('{}')", tname.replace('\'', "''")))?;
-        let mut cols: HashMap<String, Column> = HashMap::new();
-        let mut rows = cols_stmt.query([])?;
-        while let Some(r) = rows.next()? {
-            let name: String = r.get(1)?;
-            let decl_type: String = r.get::<_, Option<String>>(2)?.unwrap_or_default();
-            let notnull: i64 = r.get(3)?;
-            let pk: i64 = r.get(5)?;
-            let c = Column {
-                name: name.clone(),
-                decl_type,
-                notnull: notnull != 0,
-                pk: pk != 0,
-            };
-            cols.insert(name.to_lowercase(), c);
-        }
-        out.insert(
-            tname.to_lowercase(),
-            Table {
-                name: tname,
-                columns: cols,
-            },
-        );
+    // One round trip for every table's columns via the pragma_table_info
+    // table-valued function instead of a PRAGMA per table.
+    let mut stmt = conn.prepare(
+        "SELECT m.name, p.name, p.type, p.\"notnull\", p.pk
+         FROM sqlite_master m, pragma_table_info(m.name) p
+         WHERE m.type='table' AND m.name NOT LIKE 'sqlite_%'",
+    )?;
+    let mut rows = stmt.query([])?;
+    while let Some(r) = rows.next()? {
+        let tname: String = r.get(0)?;
+        let name: String = r.get(1)?;
+        let decl_type: String = r.get::<_, Option<String>>(2)?.unwrap_or_default();
+        let notnull: i64 = r.get(3)?;
+        let pk: i64 = r.get(4)?;
+        let decl_upper = decl_type.to_uppercase();
+        let c = Column {
+            name: name.clone(),
+            decl_type,
+            notnull: notnull != 0,
+            pk: pk != 0,
+            is_integer: decl_upper.contains("INT"),
+            is_text: ["CHAR", "CLOB", "TEXT"].iter().any(|t| decl_upper.contains(t)),
+        };
+        out.entry(tname.to_lowercase())
+            .or_insert_with(|| Table {
+                name: tname.clone(),
+                columns: HashMap::new(),
+                pk_name: None,
+            })
+            .columns
+            .insert(name.to_lowercase(), c);
+    }
+    for table in out.values_mut() {
+        let pks: Vec<&Column> = table.columns.values().filter(|c| c.pk).collect();
+        table.pk_name = if pks.len() == 1 { Some(pks[0].name.clone()) } else { None };
     }
     Ok(out)
 }
@@ -376,13 +436,13 @@ fn coerce_value(raw: &DataType, col: &Column) -> Option<rusqlite::types::Value>
     match raw {
         DataType::Empty => None,
         DataType::Bool(b) => {
-            if col.is_integer() { Some(V::Integer(if *b {1} else {0})) } else { Some(V::Text(b.to_string())) }
+            if col.is_integer { Some(V::Integer(if *b {1} else {0})) } else { Some(V::Text(b.to_string())) }
         }
         DataType::Int(i) => {
-            if col.is_integer() { Some(V::Integer(*i as i64)) } else { Some(V::Text(i.to_string())) }
+            if col.is_integer { Some(V::Integer(*i as i64)) } else { Some(V::Text(i.to_string())) }
         }
         DataType::Float(f) => {
-            if col.is_integer() {
+            if col.is_integer {
                 let v = if f.fract() == 0.0 { *f as i64 } else { f.round() as i64 };
                 Some(V::Integer(v))
             } else {
@@ -392,7 +452,7 @@ fn coerce_value(raw: &DataType, col: &Column) -> Option<rusqlite::types::Value>
         DataType::String(s) => {
             let v = s.trim();
             if v.is_empty() { return None; }
-            if col.is_integer() {
+            if col.is_integer {
                 let low = v.to_ascii_lowercase();
                 if ["true","yes","y","on"].contains(&low.as_str()) {
                     return Some(V::Integer(1));
@@ -410,7 +470,7 @@ fn coerce_value(raw: &DataType, col: &Column) -> Option<rusqlite::types::Value>
             Some(V::Text(v.to_string()))
         }
         DataType::DateTime(f) => {
-            if col.is_integer() {
+            if col.is_integer {
                 Some(rusqlite::types::Value::Integer(f.round() as i64))
             } else {
                 Some(rusqlite::types::Value::Text(f.to_string()))
@@ -420,58 +480,41 @@ fn coerce_value(raw: &DataType, col: &Column) -> Option<rusqlite::types::Value>
     }
 }
 
-fn read_worksheet(range: &calamine::Range<DataType>, table: &Table) -> Result<Vec<BTreeMap<String, rusqlite::types::Value>>> {
+/// Lazily yield coerced row maps for a worksheet so the import loop never
+/// holds more than one row beyond calamine's parsed range.
+fn worksheet_rows<'a>(
+    range: &'a calamine::Range<DataType>,
+    table: &'a Table,
+) -> impl Iterator<Item = BTreeMap<String, rusqlite::types::Value>> + 'a {
     let mut rows_iter = range.rows();
-    let headers_row = match rows_iter.next() {
-        Some(r) => r,
-        None => return Ok(vec![]),
+    // Resolve each header position straight to its Column once, so the
+    // per-cell loop below does no hash lookups or re-lowercasing.
+    let header_cols: Vec<Option<&'a Column>> = match rows_iter.next() {
+        Some(headers_row) => headers_row
+            .iter()
+            .map(|h| normalize_header(h).and_then(|h| table.columns.get(&h.to_lowercase())))
+            .collect(),
+        None => Vec::new(),
     };
-    let headers: Vec<Option<String>> = headers_row.iter().map(normalize_header).collect();
 
-    // Map headers to DB columns
-    let header_to_colname: Vec<Option<String>> = headers
-        .into_iter()
-        .map(|h| {
-            if let Some(h) = h {
-                let key = h.to_lowercase();
-                if let Some(c) = table.columns.get(&key) {
-                    Some(c.name.clone())
-                } else {
-                    None
-                }
-            } else {
-                None
-            }
-        })
-        .collect();
-
-    let mut out = Vec::new();
-    for data_row in rows_iter {
+    rows_iter.filter_map(move |data_row| {
         let mut row_map: BTreeMap<String, rusqlite::types::Value> = BTreeMap::new();
         let mut empty = true;
-        for (idx, raw) in data_row.iter().enumerate() {
-            if idx >= header_to_colname.len() { break; }
-            if let Some(ref colname) = header_to_colname[idx] {
-                if let Some(col) = table.columns.get(&colname.to_lowercase()) {
-                    if let Some(val) = coerce_value(raw, col) {
-                        empty = false;
-                        row_map.insert(col.name.clone(), val);
-                    } else {
-                        // explicit None
-                        row_map.insert(col.name.clone(), rusqlite::types::Value::Null);
-                    }
-                }
+        for (raw, header_col) in data_row.iter().zip(header_cols.iter()) {
+            let Some(col) = header_col else { continue };
+            if let Some(val) = coerce_value(raw, col) {
+                empty = false;
+                row_map.insert(col.name.clone(), val);
+            } else {
+                // explicit None
+                row_map.insert(col.name.clone(), rusqlite::types::Value::Null);
             }
         }
-        if !empty {
-            out.push(row_map);
-        }
-    }
-    Ok(out)
+        if empty { None } else { Some(row_map) }
+    })
 }
 
-fn validate_specials(table_name: &str, row: &BTreeMap<String, rusqlite::types::Value>) -> Result<()> {
-    let t = table_name.to_ascii_lowercase();
+fn validate_specials(checks: SpecialChecks, row: &BTreeMap<String, rusqlite::types::Value>) -> Result<()> {
     let get_text = |key: &str| -> Option<String> {
         row.get(key).and_then(|v| match v {
             rusqlite::types::Value::Text(s) => Some(s.clone()),
@@ -480,7 +523,7 @@ fn validate_specials(table_name: &str, row: &BTreeMap<String, rusqlite::types::V
         })
     };
 
-    if t == "door_nodes" {
+    if checks.door_direction {
         if let Some(mut dir) = get_text("direction") {
             dir = dir.trim().to_ascii_uppercase();
             if !ALLOWED_DOOR_DIRECTIONS.contains(&dir.as_str()) {
@@ -488,16 +531,18 @@ fn validate_specials(table_name: &str, row: &BTreeMap<String, rusqlite::types::V
             }
         }
     }
-    if let Some(mut nt) = get_text("next_node_type") {
-        nt = nt.trim().to_ascii_lowercase();
-        if !ALLOWED_NEXT_NODE_TYPES.contains(&nt.as_str()) {
-            bail!(
-                "Invalid next_node_type: {} (allowed {:?})",
-                nt, ALLOWED_NEXT_NODE_TYPES
-            );
+    if checks.next_node_type {
+        if let Some(mut nt) = get_text("next_node_type") {
+            nt = nt.trim().to_ascii_lowercase();
+            if !ALLOWED_NEXT_NODE_TYPES.contains(&nt.as_str()) {
+                bail!(
+                    "Invalid next_node_type: {} (allowed {:?})",
+                    nt, ALLOWED_NEXT_NODE_TYPES
+                );
+            }
         }
     }
-    if t == "requirements" {
+    if checks.requirement_comparison {
         if let Some(cmpv) = get_text("comparison") {
             if !ALLOWED_REQUIREMENT_COMPARISONS.contains(&cmpv.as_str()) {
                 bail!(
@@ -508,17 +553,21 @@ fn validate_specials(table_name: &str, row: &BTreeMap<String, rusqlite::types::V
         }
     }
 
-    if let Some(reqs) = get_text("requirements") {
-        let _ = normalize_requirements_value(&reqs)?;
+    if checks.requirements {
+        if let Some(reqs) = get_text("requirements") {
+            let _ = normalize_requirements_value(&reqs)?;
+        }
     }
     Ok(())
 }
 
-fn build_insert_sql(
+/// Split a row into the insert column list and the matching parameter
+/// values. PK columns with Null/empty values are dropped so SQLite can
+/// auto-assign them.
+fn row_insert_parts(
     table: &Table,
     row: &BTreeMap<String, rusqlite::types::Value>,
-) -> Result<(String, Vec<rusqlite::types::Value>)> {
-    // Only include known columns; skip PK if value is Null/empty
+) -> Result<(Vec<String>, Vec<rusqlite::types::Value>)> {
     let mut cols: Vec<String> = Vec::new();
     let mut vals: Vec<rusqlite::types::Value> = Vec::new();
     for (k, v) in row.iter() {
@@ -541,14 +590,14 @@ fn build_insert_sql(
     if cols.is_empty() {
         bail!("No valid columns to insert after filtering");
     }
+    Ok((cols, vals))
+}
 
-    let pk_names: Vec<String> = table
-        .columns
-        .values()
-        .filter(|c| c.pk)
-        .map(|c| c.name.clone())
-        .collect();
-    let pk_name = if pk_names.len() == 1 { Some(pk_names[0].clone()) } else { None };
+/// Render the (UPSERT) insert statement for a fixed column set. Callers
+/// cache the result per column set, so this only runs once per distinct
+/// sheet shape.
+fn insert_sql_text(table: &Table, cols: &[String]) -> String {
+    let pk_name = table.pk_name.as_deref();
 
     let placeholders = (0..cols.len()).map(|_| "?").collect::<Vec<_>>().join(",");
     let base_insert = format!(
@@ -559,20 +608,19 @@ fn build_insert_sql(
     );
 
     if let Some(pk) = pk_name {
-        if cols.iter().any(|c| c == &pk) {
+        if cols.iter().any(|c| c == pk) {
             let assignments: Vec<String> = cols
                 .iter()
                 .filter(|c| c.as_str() != pk)
                 .map(|c| format!("{}=excluded.{}", c, c))
                 .collect();
-            let sql = if assignments.is_empty() {
+            return if assignments.is_empty() {
                 base_insert.replace("INSERT ", "INSERT OR IGNORE ")
             } else {
                 format!("{} ON CONFLICT({}) DO UPDATE SET {}", base_insert, pk, assignments.join(", "))
             };
-            return Ok((sql, vals));
         }
     }
 
-    Ok((base_insert, vals))
+    base_insert
 }
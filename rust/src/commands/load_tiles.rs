@@ -1,5 +1,6 @@
 use anyhow::{Context, Result};
 use rusqlite::Connection;
+use serde::de::{DeserializeSeed, IgnoredAny, MapAccess, SeqAccess, Visitor};
 use serde::Deserialize;
 use std::fs::{self, File};
 use std::io::{BufRead, BufReader};
@@ -8,24 +9,6 @@ use std::sync::mpsc;
 use std::thread;
 use rayon::prelude::*;
 
-#[derive(Deserialize, Debug)]
-struct FileRoot {
-    #[serde(default)]
-    chunk: Option<Chunk>,
-    #[serde(default)]
-    tiles: Vec<Tile>,
-}
-
-#[derive(Deserialize, Debug, Default)]
-struct Chunk {
-    #[serde(default)]
-    x: Option<i64>,
-    #[serde(default)]
-    z: Option<i64>,
-    #[serde(rename = "chunkSize", default)]
-    chunk_size: Option<i64>,
-}
-
 #[derive(Deserialize, Debug)]
 struct Tile {
     x: i64,
@@ -42,8 +25,13 @@ pub fn cmd_load_tiles(json_folder: &Path, db_path: &Path, overrides_path: Option
     let mut conn = Connection::open(db_path)
         .with_context(|| format!("Failed to open DB at {}", db_path.display()))?;
 
+    // Bulk-write tuning: a 256 MiB page cache keeps dirty pages in memory
+    // between WAL checkpoints, and mmap lets reads go through the OS page
+    // cache without a copy.
     conn.execute_batch(
-        "PRAGMA journal_mode=WAL;\nPRAGMA synchronous=NORMAL;\nPRAGMA temp_store=MEMORY;",
+        "PRAGMA journal_mode=WAL;\nPRAGMA synchronous=NORMAL;\nPRAGMA temp_store=MEMORY;\n\
+         PRAGMA cache_size=-262144;\nPRAGMA mmap_size=268435456;\n\
+         PRAGMA journal_size_limit=67108864;",
     )?;
 
     crate::db::create_tables(&mut conn)?;
@@ -53,6 +41,10 @@ pub fn cmd_load_tiles(json_folder: &Path, db_path: &Path, overrides_path: Option
         apply_overrides_file(overrides_path, &mut conn)?;
     }
 
+    // Populate planner statistics for the freshly loaded tables so
+    // downstream readers of this DB pick sensible query plans.
+    conn.execute_batch("ANALYZE;\nPRAGMA optimize;")?;
+
     println!("Tiles successfully loaded into {}", db_path.display());
     Ok(())
 }
@@ -138,33 +130,54 @@ fn load_json_files(folder: &Path, conn: &mut Connection) -> Result<()> {
 
     drop(tx_msg);
 
-    // Optimize SQLite for bulk load and avoid maintaining indexes during insert
+    // Optimize SQLite for bulk load. idx_tiles_walkable duplicated the
+    // tiles PK and is no longer created; the DROP migrates older DBs.
     conn.execute_batch(
         "PRAGMA foreign_keys=OFF;\nDROP INDEX IF EXISTS idx_tiles_walkable;",
     )?;
 
-    // Single transaction and prepared statement reused for entire stream
+    // Single transaction and prepared statements reused for entire stream.
+    // Full chunks go through a multi-row VALUES statement so one
+    // prepare/step cycle covers INSERT_CHUNK rows instead of one.
     let txw = conn.transaction()?;
-    let mut tiles_stmt = txw.prepare(
-        "INSERT OR REPLACE INTO tiles (x, y, plane, walk_mask, RegionID) VALUES (?, ?, ?, ?, ?)",
-    )?;
+    // Upsert instead of INSERT OR REPLACE: REPLACE resolves a PK conflict
+    // as DELETE+INSERT (two B-tree mutations); DO UPDATE patches the row in
+    // place with the same last-writer-wins result for overlapping files.
+    const UPSERT_TAIL: &str =
+        " ON CONFLICT(x, y, plane) DO UPDATE SET walk_mask=excluded.walk_mask, RegionID=excluded.RegionID";
+    let multi_sql = format!(
+        "INSERT INTO tiles (x, y, plane, walk_mask, RegionID) VALUES {}{}",
+        vec!["(?, ?, ?, ?, ?)"; INSERT_CHUNK].join(", "),
+        UPSERT_TAIL
+    );
+    let mut multi_stmt = txw.prepare(&multi_sql)?;
+    let single_sql = format!(
+        "INSERT INTO tiles (x, y, plane, walk_mask, RegionID) VALUES (?, ?, ?, ?, ?){}",
+        UPSERT_TAIL
+    );
+    let mut single_stmt = txw.prepare(&single_sql)?;
 
     // Drain messages as they arrive and insert rows
     for batch in rx_msg {
-        if batch.tile_rows.is_empty() { continue; }
-        for row in batch.tile_rows {
+        let mut chunks = batch.tile_rows.chunks_exact(INSERT_CHUNK);
+        for chunk in &mut chunks {
+            let params = chunk
+                .iter()
+                .flat_map(|r| [&r.0 as &dyn rusqlite::ToSql, &r.1, &r.2, &r.3, &r.4]);
+            multi_stmt.execute(rusqlite::params_from_iter(params))?;
+        }
+        for row in chunks.remainder() {
             let (x, y, plane, walk_mask, region_id) = row;
-            tiles_stmt.execute(rusqlite::params![x, y, plane, walk_mask, region_id])?;
+            single_stmt.execute(rusqlite::params![x, y, plane, walk_mask, region_id])?;
         }
     }
 
-    drop(tiles_stmt);
+    drop(multi_stmt);
+    drop(single_stmt);
     txw.commit()?;
 
-    // Recreate index and restore FK checks after load
-    conn.execute_batch(
-        "CREATE INDEX IF NOT EXISTS idx_tiles_walkable ON tiles(x, y, plane);\nPRAGMA foreign_keys=ON;",
-    )?;
+    // Restore FK checks after load
+    conn.execute_batch("PRAGMA foreign_keys=ON;")?;
 
     // Ensure producers are finished
     let _ = producer.join();
@@ -183,51 +196,115 @@ struct FileBatch {
     tile_rows: Vec<TileRow>,
 }
 
+/// Batch size for tile rows sent to the writer; bounds producer memory to
+/// O(SUB_BATCH) per file regardless of file size.
+const SUB_BATCH: usize = 50_000;
+
+/// Rows per multi-row INSERT on the writer side (5 bind parameters each,
+/// well under SQLite's variable limit).
+const INSERT_CHUNK: usize = 100;
+
 fn parse_file_and_stream(path: &Path, sender: &mpsc::Sender<FileBatch>) -> Result<()> {
     println!("Loading {}...", path.display());
     let file = File::open(&path).with_context(|| format!("open {}", path.display()))?;
     let reader = BufReader::new(file);
-    let data: FileRoot = serde_json::from_reader(reader)
+
+    // Stream the "tiles" array straight off the deserializer instead of
+    // materializing the whole file as a Vec<Tile> before batching; only one
+    // sub-batch is ever live per producer.
+    let mut de = serde_json::Deserializer::from_reader(reader);
+    RootSeed { sender }
+        .deserialize(&mut de)
         .with_context(|| format!("parse JSON {}", path.display()))?;
+    Ok(())
+}
+
+/// Deserializes the top-level object, ignoring everything except the
+/// `tiles` array, which is converted and sent batch-by-batch.
+struct RootSeed<'a> {
+    sender: &'a mpsc::Sender<FileBatch>,
+}
 
-    if data.tiles.is_empty() {
-        return Ok(());
+impl<'de> DeserializeSeed<'de> for RootSeed<'_> {
+    type Value = ();
+
+    fn deserialize<D>(self, deserializer: D) -> std::result::Result<(), D::Error>
+    where
+        D: serde::Deserializer<'de>,
+    {
+        deserializer.deserialize_map(self)
     }
+}
 
+impl<'de> Visitor<'de> for RootSeed<'_> {
+    type Value = ();
 
-    // Send chunk meta first so writer can insert chunk row
-    sender.send(FileBatch {
-        tile_rows: Vec::new(),
-    }).map_err(|e| anyhow::anyhow!(e))?;
+    fn expecting(&self, f: &mut std::fmt::Formatter) -> std::fmt::Result {
+        f.write_str("a tile chunk object")
+    }
 
-    // Stream tile rows in small chunks to bound memory
-    const SUB_BATCH: usize = 1_000_000;
-    let mut rows: Vec<TileRow> = Vec::with_capacity(SUB_BATCH);
-    for t in data.tiles.into_iter() {
-        // Compute RegionID from x,y: regionId = (regionX << 8) + regionY,
-        // where regionX = x >> 6 and regionY = y >> 6
-        let region_x = t.x >> 6;
-        let region_y = t.y >> 6;
-        let region_id = (region_x << 8) + region_y;
-        rows.push((
-            t.x,
-            t.y,
-            t.plane,
-            t.walk_mask,
-            region_id,
-        ));
-        if rows.len() >= SUB_BATCH {
-            sender.send(FileBatch {
-                tile_rows: std::mem::take(&mut rows),
-            }).map_err(|e| anyhow::anyhow!(e))?;
+    fn visit_map<A>(self, mut map: A) -> std::result::Result<(), A::Error>
+    where
+        A: MapAccess<'de>,
+    {
+        while let Some(key) = map.next_key::<String>()? {
+            if key == "tiles" {
+                map.next_value_seed(TilesSeed { sender: self.sender })?;
+            } else {
+                map.next_value::<IgnoredAny>()?;
+            }
         }
+        Ok(())
+    }
+}
+
+struct TilesSeed<'a> {
+    sender: &'a mpsc::Sender<FileBatch>,
+}
+
+impl<'de> DeserializeSeed<'de> for TilesSeed<'_> {
+    type Value = ();
+
+    fn deserialize<D>(self, deserializer: D) -> std::result::Result<(), D::Error>
+    where
+        D: serde::Deserializer<'de>,
+    {
+        deserializer.deserialize_seq(self)
     }
+}
+
+impl<'de> Visitor<'de> for TilesSeed<'_> {
+    type Value = ();
 
-    if !rows.is_empty() {
-        sender.send(FileBatch {
-            tile_rows: rows,
-        }).map_err(|e| anyhow::anyhow!(e))?;
+    fn expecting(&self, f: &mut std::fmt::Formatter) -> std::fmt::Result {
+        f.write_str("an array of tiles")
     }
 
-    Ok(())
+    fn visit_seq<A>(self, mut seq: A) -> std::result::Result<(), A::Error>
+    where
+        A: SeqAccess<'de>,
+    {
+        use serde::de::Error;
+
+        let mut rows: Vec<TileRow> = Vec::with_capacity(SUB_BATCH);
+        while let Some(t) = seq.next_element::<Tile>()? {
+            // Compute RegionID from x,y: regionId = (regionX << 8) + regionY,
+            // where regionX = x >> 6 and regionY = y >> 6
+            let region_x = t.x >> 6;
+            let region_y = t.y >> 6;
+            let region_id = (region_x << 8) + region_y;
+            rows.push((t.x, t.y, t.plane, t.walk_mask, region_id));
+            if rows.len() >= SUB_BATCH {
+                self.sender
+                    .send(FileBatch { tile_rows: std::mem::take(&mut rows) })
+                    .map_err(A::Error::custom)?;
+            }
+        }
+        if !rows.is_empty() {
+            self.sender
+                .send(FileBatch { tile_rows: rows })
+                .map_err(A::Error::custom)?;
+        }
+        Ok(())
+    }
 }
@@ -231,6 +231,8 @@ CREATE TABLE teleports_requirements (
     comparison TEXT
 );
 
+-- WITHOUT ROWID: the (x, y, plane) key is the table's only B-tree, so
+-- rows are not stored twice (rowid table + PK index).
 CREATE TABLE tiles (
     x INTEGER,
     y INTEGER,
@@ -238,7 +240,7 @@ CREATE TABLE tiles (
     walk_mask INTEGER,
     RegionID INTEGER,
     PRIMARY KEY (x, y, plane)
-);
+) WITHOUT ROWID;
 
 -- ========== INDEXES ==========
 
@@ -259,8 +261,9 @@ CREATE TABLE tiles (
 --    ON cluster_intraconnections(entrance_from, entrance_to);
 
 -- removed: idx_tiles_chunk / idx_tiles_chunk_boundary (chunk-based)
-CREATE INDEX idx_tiles_walkable
-    ON tiles(x, y, plane);
+-- removed: idx_tiles_walkable(x, y, plane) — duplicate of the tiles PK index
+--CREATE INDEX idx_tiles_walkable
+--    ON tiles(x, y, plane);
 
 --CREATE INDEX idx_tiles_xyplane
 --    ON tiles(x, y, plane);
@@ -22,6 +22,32 @@ _DIRECTION_ALIASES = {
     "down": "bottom",
 }
 
+_NAME_TO_BIT = {name: 1 << bit for bit, name in DIRECTION_BITS}
+
+_VALID_NAMES = frozenset(name for _, name in DIRECTION_BITS)
+
+_OFFSET_TO_DIR = {
+    (-1, 0): "left",
+    (0, 1): "bottom",
+    (1, 0): "right",
+    (0, -1): "top",
+    (-1, -1): "topleft",
+    (-1, 1): "bottomleft",
+    (1, 1): "bottomright",
+    (1, -1): "topright",
+}
+
+_MISSING = object()
+
+# walk_mask is an 8-bit value, so both decode shapes can be precomputed for
+# all 256 masks once at import; each call is then a single tuple index.
+_DIRS_LUT: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(name for bit, name in DIRECTION_BITS if mask & (1 << bit)) for mask in range(256)
+)
+_DECODE_LUT: Tuple[Dict[str, bool], ...] = tuple(
+    {name: bool(mask & (1 << bit)) for bit, name in DIRECTION_BITS} for mask in range(256)
+)
+
 
 def parse_int(value: str) -> int:
     value = value.strip()
@@ -31,19 +57,18 @@ def parse_int(value: str) -> int:
 
 
 def decode_walk_mask(walk_mask: int) -> Dict[str, bool]:
-    return {name: bool(walk_mask & (1 << bit)) for bit, name in DIRECTION_BITS}
+    return dict(_DECODE_LUT[walk_mask & 0xFF])
 
 
 def encode_walk_mask(walkable: Dict[str, bool]) -> int:
     mask = 0
-    for bit, name in DIRECTION_BITS:
+    for name, bit_value in _NAME_TO_BIT.items():
         if walkable.get(name, False):
-            mask |= 1 << bit
+            mask |= bit_value
     return mask
 
 
 def encode_walk_mask_from_directions(directions: List[str]) -> int:
-    valid = {name for _, name in DIRECTION_BITS}
     normalized: List[str] = []
     for d in directions:
         d = d.strip().lower()
@@ -51,24 +76,13 @@ def encode_walk_mask_from_directions(directions: List[str]) -> int:
             continue
         normalized.append(_DIRECTION_ALIASES.get(d, d))
 
-    unknown = sorted({d for d in normalized if d not in valid})
+    unknown = sorted({d for d in normalized if d not in _VALID_NAMES})
     if unknown:
         raise ValueError(f"unknown direction(s): {', '.join(unknown)}")
     return encode_walk_mask({d: True for d in normalized})
 
 
 def _parse_positions_as_directions(value: Any) -> List[str]:
-    offset_to_dir = {
-        (-1, 0): "left",
-        (0, 1): "bottom",
-        (1, 0): "right",
-        (0, -1): "top",
-        (-1, -1): "topleft",
-        (-1, 1): "bottomleft",
-        (1, 1): "bottomright",
-        (1, -1): "topright",
-    }
-
     if not isinstance(value, list):
         raise ValueError("positions must be a list")
 
@@ -89,7 +103,7 @@ def _parse_positions_as_directions(value: Any) -> List[str]:
         except (TypeError, ValueError) as e:
             raise ValueError(f"invalid position offset: {item!r}") from e
 
-        name = offset_to_dir.get((dx_i, dy_i))
+        name = _OFFSET_TO_DIR.get((dx_i, dy_i))
         if name is None:
             raise ValueError(f"unsupported offset: {(dx_i, dy_i)!r}")
         directions.append(name)
@@ -111,31 +125,33 @@ def parse_walkable_json(raw: str) -> List[str]:
     if not isinstance(data, dict):
         raise ValueError("json must be an object or array")
 
-    if "directions" in data:
-        directions = data["directions"]
+    # One .get per candidate key instead of an `in` probe followed by a
+    # second lookup; the sentinel keeps present-but-null keys on the same
+    # error path as before.
+    directions = data.get("directions", _MISSING)
+    if directions is not _MISSING:
         if not isinstance(directions, list) or not all(isinstance(x, str) for x in directions):
             raise ValueError("directions must be a list of strings")
         return list(directions)
 
-    if "walkable" in data:
-        walkable = data["walkable"]
+    walkable = data.get("walkable", _MISSING)
+    if walkable is not _MISSING:
         if not isinstance(walkable, dict):
             raise ValueError("walkable must be an object")
-        directions = [k for k, v in walkable.items() if bool(v)]
-        return directions
+        return [k for k, v in walkable.items() if bool(v)]
 
-    if "positions" in data:
-        return _parse_positions_as_directions(data["positions"])
+    positions = data.get("positions", _MISSING)
+    if positions is not _MISSING:
+        return _parse_positions_as_directions(positions)
 
     if all(isinstance(k, str) for k in data.keys()):
-        directions = [k for k, v in data.items() if bool(v)]
-        return directions
+        return [k for k, v in data.items() if bool(v)]
 
     raise ValueError("unrecognized json shape")
 
 
 def walkable_directions(walk_mask: int) -> List[str]:
-    return [name for bit, name in DIRECTION_BITS if (walk_mask & (1 << bit))]
+    return list(_DIRS_LUT[walk_mask & 0xFF])
 
 
 def _extract_encode_value(argv: List[str]) -> str | None: